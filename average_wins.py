@@ -1,6 +1,7 @@
 import pomcp
 import blackjack
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
 
 
 pomcp_agent = pomcp.POMCP()
@@ -20,111 +21,48 @@ N = 5000
 n_decks = [5,6,7,8,9,10,11,12,13]
 
 
-
-''' Get average wins with random agent, pomcp, and dealer'''
-pomcp_win =[]
-rand_win =[]
-for deck in n_decks:
-    game = blackjack.Simulator(*pomcp_a1,dealer=dealer,n_decks=deck)
-    outcomes = game.run(N)
-    dealer_scores = outcomes[dealer]
-    pomcp_win.append(sum(outcomes[pomcp_agent] > dealer_scores)/N)
-    rand_win.append(sum(outcomes[a1] > dealer_scores)/N)
-
-
-scores1 = pd.DataFrame(columns=['Decks','POMCP','Random'])
-scores1['Decks']   = n_decks
-scores1['POMCP']   = pomcp_win
-scores1['Random']  = rand_win
-print('POMCP v RandomAgent')
-print(scores1)
-print('\n')
-
-
-
-''' Get average wins with dealer agent 16, pomcp, and dealer'''
-pomcp_win =[]
-a16_win =[]
-for deck in n_decks:
-    game = blackjack.Simulator(*pomcp_a2,dealer=dealer,n_decks=deck)
-    outcomes = game.run(N)
-    dealer_scores = outcomes[dealer]
-    pomcp_win.append(sum(outcomes[pomcp_agent] > dealer_scores)/N)
-    a16_win.append(sum(outcomes[a2] > dealer_scores)/N)
-
-
-scores2 = pd.DataFrame(columns=['Decks','POMCP','Agent16'])
-scores2['Decks']   = n_decks
-scores2['POMCP']   = pomcp_win
-scores2['Agent16']  = a16_win
-print('POMCP v DealerAgent(n=16)')
-print(scores2)
-print('\n')
-
-
-
-''' Get average wins with dealer agent 17, pomcp, and dealer'''
-pomcp_win =[]
-a17_win =[]
-for deck in n_decks:
-    game = blackjack.Simulator(*pomcp_a3,dealer=dealer,n_decks=deck)
-    outcomes = game.run(N)
-    dealer_scores = outcomes[dealer]
-    pomcp_win.append(sum(outcomes[pomcp_agent] > dealer_scores)/N)
-    a17_win.append(sum(outcomes[a3] > dealer_scores)/N)
-
-
-scores3 = pd.DataFrame(columns=['Decks','POMCP','Agent17'])
-scores3['Decks']   = n_decks
-scores3['POMCP']   = pomcp_win
-scores3['Agent17']  = a17_win
-print('POMCP v DealerAgent(n=17)')
-print(scores3)
-print('\n')
-
-''' Get average wins with dealer agent 18, pomcp, and dealer'''
-pomcp_win =[]
-a18_win =[]
-for deck in n_decks:
-    game = blackjack.Simulator(*pomcp_a4,dealer=dealer,n_decks=deck)
-    outcomes = game.run(N)
-    dealer_scores = outcomes[dealer]
-    pomcp_win.append(sum(outcomes[pomcp_agent] > dealer_scores)/N)
-    a18_win.append(sum(outcomes[a4] > dealer_scores)/N)
-
-
-scores4 = pd.DataFrame(columns=['Decks','POMCP','Agent18'])
-scores4['Decks']   = n_decks
-scores4['POMCP']   = pomcp_win
-scores4['Agent18']  = a17_win
-print('POMCP v DealerAgent(n=18)')
-print(scores4)
-print('\n')
-
-
-
-''' Get average wins with 4 agents, pomcp, and dealer'''
-pomcp_win =[]
-rand_win =[]
-a16_win =[]
-a17_win =[]
-a18_win =[]
-for deck in n_decks:
-    game = blackjack.Simulator(*agents,dealer=dealer,n_decks=deck)
+# Each scenario is a table: a title, the players to simulate, and the
+# (column label, agent) pairs whose win rates the table reports. Every
+# (scenario, deck) cell is an independent simulation, so the whole sweep
+# is dispatched as one parallel batch instead of serial loops.
+scenarios = [
+    ('POMCP v RandomAgent', pomcp_a1,
+     [('POMCP', pomcp_agent), ('Random', a1)]),
+    ('POMCP v DealerAgent(n=16)', pomcp_a2,
+     [('POMCP', pomcp_agent), ('Agent16', a2)]),
+    ('POMCP v DealerAgent(n=17)', pomcp_a3,
+     [('POMCP', pomcp_agent), ('Agent17', a3)]),
+    ('POMCP v DealerAgent(n=18)', pomcp_a4,
+     [('POMCP', pomcp_agent), ('Agent18', a4)]),
+    ('POMCP v All Agents', agents,
+     [('POMCP', pomcp_agent), ('Random', a1), ('Agent16', a2),
+      ('Agent17', a3), ('Agent18', a4)]),
+]
+
+jobs = [(players, tracked, deck)
+        for _, players, tracked in scenarios
+        for deck in n_decks]
+
+
+def run_one(job):
+    '''Run one (scenario, deck) cell and return the tracked win rates.'''
+    players, tracked, deck = job
+    game = blackjack.Simulator(*players, dealer=dealer, n_decks=deck)
     outcomes = game.run(N)
     dealer_scores = outcomes[dealer]
-    pomcp_win.append(sum(outcomes[pomcp_agent] > dealer_scores)/N)
-    rand_win.append(sum(outcomes[a1] > dealer_scores)/N)
-    a16_win.append(sum(outcomes[a2] > dealer_scores)/N)
-    a17_win.append(sum(outcomes[a3] > dealer_scores)/N)
-    a18_win.append(sum(outcomes[a4] > dealer_scores)/N)
-
-scores = pd.DataFrame(columns=['Decks','POMCP','Random','Agent16','Agent17','Agent18'])
-scores['Decks']   = n_decks
-scores['POMCP']   = pomcp_win
-scores['Random']  = rand_win
-scores['Agent16'] = a16_win
-scores['Agent17'] = a17_win
-scores['Agent18'] = a18_win
-print('POMCP v All Agents')
-print(scores)
+    return [(outcomes[agent] > dealer_scores).mean() for _, agent in tracked]
+
+
+if __name__ == '__main__':
+    with ProcessPoolExecutor() as executor:
+        results = list(executor.map(run_one, jobs))
+
+    for i, (title, players, tracked) in enumerate(scenarios):
+        rates = results[i*len(n_decks):(i+1)*len(n_decks)]
+        table = pd.DataFrame(columns=['Decks'] + [label for label, _ in tracked])
+        table['Decks'] = n_decks
+        for k, (label, _) in enumerate(tracked):
+            table[label] = [row[k] for row in rates]
+        print(title)
+        print(table)
+        print('\n')
@@ -45,8 +45,9 @@ will treat these as opaque vales.
 TODO: write this up
 '''
 
-from copy import copy, deepcopy
+from concurrent.futures import ProcessPoolExecutor
 from enum import IntEnum
+from functools import lru_cache
 import logging
 import numpy as np
 import pandas as pd
@@ -54,6 +55,154 @@ import random
 
 logger = logging.getLogger(__name__)
 
+try:
+    from numba import njit
+except ImportError:
+    # Numba is optional. Without it the kernels below run as plain Python.
+    def njit(*args, **kwargs):
+        return lambda fn: fn
+
+
+# The value of each card by rank, with aces counted as 11. Index 0 is
+# unused so that ranks index directly.
+_CARD_VALUES = (0, 11, 2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10)
+
+# Packed-hand encoding: a hand is one int holding ten 5-bit counters,
+# one per distinct card value. Field 0 counts aces, fields 1-8 count
+# ranks 2-9, and field 9 merges the four ten-valued ranks (10, J, Q, K),
+# which score identically. Adding a card to a hand is then a single
+# integer add, and hands hash as plain ints in the transposition table.
+_PACKED_VALUES = (11, 2, 3, 4, 5, 6, 7, 8, 9, 10)
+_CARD_PACKED = (0,) + tuple(1 << (5 * min(card - 1, 9))
+                            for card in range(1, 14))
+
+
+@njit(cache=True)
+def _score_hand(hand):
+    '''Scores a packed hand (see `_CARD_PACKED`).
+
+    This is the innermost kernel of every simulation, so it is kept as a
+    standalone function over plain integers for Numba to compile; the
+    packed encoding makes it a short shift/mask sequence.
+
+    Returns `(score, soft, busted)` as described by `State.score_soft_busted`.
+    '''
+    aces = hand & 0x1F
+    score = 0
+    for i in range(10):
+        score += ((hand >> (5 * i)) & 0x1F) * _PACKED_VALUES[i]
+
+    # Downgrade aces from 11 to 1 in closed form: each deduction takes
+    # 10 off, so the number needed is ceil(excess / 10), capped by the
+    # aces in hand.
+    excess = score - 21
+    if excess > 0:
+        deductions = min(aces, (excess + 9) // 10)
+        score -= 10 * deductions
+        aces -= deductions
+
+    soft = (aces > 0)
+    if soft and score == 21:
+        score = 22
+    elif score > 21:
+        score = 0
+    busted = (score == 0)
+
+    return score, soft, busted
+
+
+# The raw kernel stays reachable so other compiled kernels can call it
+# without going through the Python-level cache below.
+_score_hand_kernel = _score_hand
+
+# Transposition table over the scoring kernel. Scores are pure functions
+# of the packed hand and only a few thousand hands are reachable,
+# so the table saturates after a few hundred rollouts and persists across
+# rounds.
+_score_hand = lru_cache(maxsize=None)(_score_hand)
+
+
+@njit(cache=True)
+def _dealer_rollout(hand, counts, total, n, discount, max_steps):
+    '''Plays out one hand with the dealer policy, fully compiled.
+
+    Mirrors stepping a `SampleState` under `DealerAgent(n)` one action
+    at a time: each step burns a card from the shoe whether hitting or
+    standing, and the discounted score of each successive state is
+    accumulated into the return. `counts` is consumed in place, so
+    callers pass a scratch copy.
+    '''
+    total_reward = 0.0
+    gamma = 1.0
+    for _ in range(max_steps):
+        score, soft, busted = _score_hand_kernel(hand)
+        hit = score < n or (soft and score == n)
+
+        if total <= 0:
+            break
+        r = np.random.random() * total
+        cum = 0
+        card = 13
+        for i in range(13):
+            cum += counts[i]
+            if r < cum:
+                card = i + 1
+                break
+        counts[card - 1] -= 1
+        total -= 1
+
+        if hit:
+            hand += _CARD_PACKED[card]
+            score, soft, busted = _score_hand_kernel(hand)
+            total_reward += gamma * score
+            gamma *= discount
+            if busted:
+                break
+        else:
+            total_reward += gamma * score
+            break
+
+    return total_reward
+
+
+_CARD_VALUES_NP = np.array(_CARD_VALUES)
+
+
+def _score_hands_np(rank_counts):
+    '''Vectorized counterpart of `_score_hand` over an `(n, 14)` count matrix.
+
+    Returns `(score, soft, busted)` as parallel arrays.
+    '''
+    aces = rank_counts[:, 1]
+    score = rank_counts @ _CARD_VALUES_NP
+
+    excess = np.maximum(score - 21, 0)
+    deductions = np.minimum(aces, (excess + 9) // 10)
+    score = score - 10 * deductions
+
+    soft = (aces - deductions) > 0
+    blackjack = soft & (score == 21)
+    score = np.where(score > 21, 0, score)
+    score = np.where(blackjack, 22, score)
+    busted = (score == 0)
+
+    return score, soft, busted
+
+
+def _draw_rows(counts, rows, rng):
+    '''Draws one card for each of the selected rows of a counts matrix.
+
+    Decrements the drawn counts in place and returns the drawn cards.
+    '''
+    sub = counts[rows]
+    r = rng.random(len(rows)) * sub.sum(axis=1)
+    cum = np.cumsum(sub, axis=1)
+    idx = (cum <= r[:, None]).sum(axis=1)
+    counts[rows, idx] -= 1
+    return idx + 1
+
+
+
 
 class Action(IntEnum):
     '''The possible actions in a game of Blackjack.
@@ -68,29 +217,88 @@ class Action(IntEnum):
     # DOUBLE = 3
     # SPLIT = 4
 
+
+# The only two action sets that can occur, cached so that `State.actions`
+# never rebuilds a tuple by iterating the enum.
+_ALL_ACTIONS = tuple(Action)
+_NO_ACTIONS = ()
+
+
 class Shoe:
     '''A shuffled collection of French playing cards.'''
 
-    _INDICIES = np.arange(13)
+    # Shoes, states, observations, and samples are created on every
+    # MCTS step, so they all declare `__slots__`: no per-instance dict,
+    # and attribute access compiles to a fixed offset.
+    __slots__ = ('n_decks', 'counts', '_total', 'rng')
+
+    def __init__(self, n_decks, seed=None):
+        '''Create a full Shoe with some number of decks of cards.
 
-    def __init__(self, n_decks):
-        '''Create a full Shoe with some number of decks of cards.'''
+        Args:
+            n_decks: The number of decks of cards.
+            seed: An optional seed for the shoe's random number generator.
+        '''
         assert n_decks > 0, '`n_decks` must be greater than 0.'
         self.n_decks = n_decks
-        self.counts = np.zeros(13, dtype=int) + 4*n_decks
+        self.counts = [4 * n_decks] * 13
+        self._total = 52 * n_decks
+        self.rng = random.Random(seed)
 
     def __len__(self):
         '''The length of a shoe is the number of cards.'''
-        return np.sum(self.counts)
+        return self._total
+
+    def clone(self):
+        '''Returns a copy of this shoe which can be mutated independently.
+
+        This is much cheaper than `copy.deepcopy`, which routes every
+        attribute through the generic memoizing machinery.
+        '''
+        new_shoe = Shoe.__new__(Shoe)
+        new_shoe.n_decks = self.n_decks
+        new_shoe.counts = self.counts.copy()
+        new_shoe._total = self._total
+        new_shoe.rng = self.rng
+        return new_shoe
 
     def sample(self):
-        assert len(self) > 0, 'cannot sample from an empty shoe.'
-        i = np.random.choice(Shoe._INDICIES, p=self.counts/np.sum(self.counts))
-        new_shoe = deepcopy(self)
+        total = self._total
+        assert total > 0, 'cannot sample from an empty shoe.'
+
+        # Draw a card in proportion to its count by scanning the cumulative
+        # counts. The scan is over just 13 list entries, which beats both a
+        # normalized `np.random.choice` and a compiled kernel's call
+        # overhead per draw.
+        counts = self.counts
+        r = self.rng.random() * total
+        cum = 0
+        for i in range(13):
+            cum += counts[i]
+            if r < cum:
+                break
+
+        new_shoe = self.clone()
         new_shoe.counts[i] -= 1
+        new_shoe._total = total - 1
         card = i + 1
         return card, new_shoe
 
+    def sample_n(self, n):
+        '''Draw `n` cards from this shoe, with replacement, in one shot.
+
+        Each card is an independent draw from the current counts, so the
+        result is distributed like `n` calls to `sample` on this shoe.
+        The shoe is not mutated; callers account for the drawn cards
+        themselves.
+        '''
+        total = self._total
+        assert total > 0, 'cannot sample from an empty shoe.'
+        rng = np.random.default_rng(self.rng.getrandbits(64))
+        cum = np.cumsum(self.counts)
+        idx = np.searchsorted(cum, rng.random(n) * total, side='right')
+        return idx + 1
+
     def replace(self, card):
         '''Replace a card back into the shoe at a random position.'''
 
@@ -99,8 +307,9 @@ class Shoe:
 
         max_count = 4 * self.n_decks
         assert count <= max_count, f'cannot have more than {max_count} cards of value {card}.'
-        new_shoe = deepcopy(self)
+        new_shoe = self.clone()
         new_shoe.counts[i] = count + 1
+        new_shoe._total = self._total + 1
         return new_shoe
 
 
@@ -108,22 +317,29 @@ class Shoe:
 class State:
     '''A state of a round of Blackjack.'''
 
-    def __init__(self, shoe, hands, stand):
-        '''Create a new state from a given shoe and hands dict.
+    __slots__ = ('shoe', 'hands', '_obs_shoes', 'stand', 'dealer', 'hole')
+
+    def __init__(self, shoe, hands, stand, hole):
+        '''Create a new state from a given shoe and hands.
 
         Args:
             shoe:
                 The shoe to draw from when sampling the next state.
             hands:
-                A list of hands for the agents. Hands are represented as nested
-                tuples (cons cells). The last hand belongs to the dealer.
+                The hands of the agents, each packed into a single int
+                of per-value card counters (see `_CARD_PACKED`). The
+                last hand belongs to the dealer.
             stand:
                 A list of boolean states for the agents. True means they stand.
+            hole:
+                The dealer's hole card.
         '''
         self.shoe = shoe
         self.hands = tuple(hands)
+        self._obs_shoes = None
         self.stand = tuple(stand or self.busted(j) for j, stand in enumerate(stand))
         self.dealer = len(self.hands) - 1
+        self.hole = hole
 
     @classmethod
     def start_state(cls, shoe, n_agents):
@@ -137,19 +353,16 @@ class State:
         for i in range(n_agents):
             a, shoe = shoe.sample()
             b, shoe = shoe.sample()
-            hand = (a, (b, ()))
-            hands.append(hand)
+            hands.append(_CARD_PACKED[a] + _CARD_PACKED[b])
 
-        hands = tuple(hands)
+        # The last agent is the dealer; their second card is the hole card.
+        hole = b
         stand = tuple(False for i in range(n_agents))
-        return cls(shoe, hands, stand)
+        return cls(shoe, hands, stand, hole)
 
     def hidden_card(self):
         '''Returns the dealer's hidden card.'''
-        hand = self.hands[self.dealer]
-        while hand is not ():
-            card, hand = hand
-        return card
+        return self.hole
 
     def sample(self, agent, action):
         '''Sample a new state from this state by commiting an action as a player.'''
@@ -159,22 +372,56 @@ class State:
 
         card, shoe = self.shoe.sample()
 
-        if action is Action.HIT:
-            new_hand = (card, self.hands[agent])
+        if action == Action.HIT:
+            new_hand = self.hands[agent] + _CARD_PACKED[card]
         else:
             new_hand = self.hands[agent]
 
-        if action is Action.STAND:
+        if action == Action.STAND:
             new_stand = True
         else:
             new_stand = self.stand[agent]
 
-        hands = (new_hand if i is agent else hand for i, hand in enumerate(self.hands))
-        stand = (new_stand if i is agent else stand for i, stand in enumerate(self.stand))
-        return State(shoe, hands, stand)
+        hands = tuple(new_hand if i == agent else hand for i, hand in enumerate(self.hands))
+        stand = (new_stand if i == agent else stand for i, stand in enumerate(self.stand))
+        return State(shoe, hands, stand, self.hole)
+
+    def with_shoe(self, shoe):
+        '''Returns a state identical to this one but drawing from `shoe`.
+
+        Hands, stand flags, and the hole card are shared by reference;
+        this replaces the generic shallow copy on the observation paths.
+        '''
+        state = State.__new__(State)
+        state.shoe = shoe
+        state.hands = self.hands
+        state._obs_shoes = None
+        state.stand = self.stand
+        state.dealer = self.dealer
+        state.hole = self.hole
+        return state
+
+    def _obs_shoe(self, hidden_card):
+        '''Returns a shoe with the dealer's hole card folded back in.
+
+        The snapshot is built lazily and shared by every observation of
+        this state: shoes are never mutated in place, so observers can
+        safely hold the same one.
+        '''
+        if self._obs_shoes is None:
+            self._obs_shoes = {}
+        shoe = self._obs_shoes.get(hidden_card)
+        if shoe is None:
+            shoe = self.shoe.replace(hidden_card)
+            self._obs_shoes[hidden_card] = shoe
+        return shoe
 
     def get_observation(self, agent, is_dealer):
-        '''Returns the observation for the given agent.'''
+        '''Returns the observation for the given agent.
+
+        The dealer's hole card is folded back into the observed shoe
+        unless the observation is for the dealer, who knows it anyway.
+        '''
         if is_dealer:
             return Observation(self, agent, None)
         else:
@@ -182,13 +429,17 @@ class State:
 
     def actions(self, agent):
         '''Returns the set of valid actions for the given agent.'''
-        return tuple(Action) if not self.stand[agent] else ()
+        return _NO_ACTIONS if self.stand[agent] else _ALL_ACTIONS
 
     def score(self, agent):
         '''Returns the score of an agent's hand.'''
         score, _, _ = self.score_soft_busted(agent)
         return score
 
+    def score_all(self):
+        '''Returns the scores of every agent's hand as a tuple.'''
+        return tuple(self.score_soft_busted(j)[0] for j in range(len(self.hands)))
+
     def busted(self, agent):
         '''Returns True if an agent is busted.'''
         _, _, busted = self.score_soft_busted(agent)
@@ -209,32 +460,11 @@ class State:
             - `score` is the score of the agents hand, and
             - `soft` is True if the score is soft.
             - `busted` is True if the agent has busted
-        '''
-        aces = 0
-        score = 0
-
-        hand = self.hands[agent]
-        while hand is not ():
-            card, hand = hand
-            if card is 1:
-                aces += 1
-                score += 11
-            elif card > 10:
-                score += 10
-            else:
-                score += card
-
-        while score > 21 and aces > 0:
-            score -= 10
 
-        soft = (aces > 0)
-        if soft and score is 21:
-            score = 22
-        elif score > 21:
-            score = 0
-        busted = score == 0
-
-        return score, soft, busted
+        Results come from a global table keyed on the rank counts, so
+        repeated queries of any previously-seen hand are O(1).
+        '''
+        return _score_hand(self.hands[agent])
 
 
 class Observation:
@@ -247,22 +477,44 @@ class Observation:
     this state is considered to be cheating.
     '''
 
+    __slots__ = ('_state', 'agent')
+
     def __init__(self, state, agent, hidden_card=None):
         '''Construct an observation of the given state for some agent.'''
         if hidden_card is not None:
-            state = copy(state)
-            state.shoe = state.shoe.replace(hidden_card)
+            state = state.with_shoe(state._obs_shoe(hidden_card))
 
         self._state = state
         self.agent = agent
 
     def __eq__(self, other):
-        return np.array_equal(self._state.shoe, other._state.shoe)
+        # Two observations are the same when everything the agent can
+        # see matches: the hands on the table, who stands, and the
+        # composition of the (hole-corrected) shoe. This is what lets a
+        # belief survive between decisions — particles whose sampled
+        # cards matched the real deal compare equal to the next live
+        # observation and are kept by the filter.
+        state = self._state
+        other_state = other._state
+        return (self.agent == other.agent
+                and state.hands == other_state.hands
+                and state.stand == other_state.stand
+                and state.shoe.counts == other_state.shoe.counts)
 
     def sample_state(self):
         '''Sample possible future state from this observation.'''
-        state = copy(self._state)
-        return SampleState(state, self.agent)
+        return SampleState(self._state, self.agent)
+
+    def sample_states(self, n):
+        '''Sample `n` possible future states with one vectorized draw.
+
+        Equivalent to `n` calls to `sample_state`, but the hidden cards
+        are drawn in a single batch instead of one scan per particle.
+        '''
+        state = self._state
+        cards = state.shoe.sample_n(n)
+        return [SampleState.from_hidden_card(state, self.agent, card)
+                for card in cards.tolist()]
 
     def actions(self):
         '''Returns a set of valid actions.'''
@@ -294,22 +546,62 @@ class SampleState:
 
     The API is mostly like State, but oriented aound a fixed agent.
     '''
+
+    __slots__ = ('_state', 'hidden_card', 'agent', '_obs')
+
     def __init__(self, state, agent):
-        state = copy(state)
-        hidden_card, state.shoe = state.shoe.sample()
+        hidden_card, shoe = state.shoe.sample()
 
-        self._state = state
+        self._state = state.with_shoe(shoe)
         self.hidden_card = hidden_card
         self.agent = agent
+        self._obs = None
+
+    @classmethod
+    def from_hidden_card(cls, state, agent, hidden_card):
+        '''Constructs a sample state whose hidden card was drawn in bulk.
+
+        Used by `Observation.sample_states`, which draws the hidden
+        cards for a whole batch of samples in one vectorized call.
+        '''
+        shoe = state.shoe.clone()
+        shoe.counts[hidden_card - 1] -= 1
+        shoe._total -= 1
+
+        sample_state = cls.__new__(cls)
+        sample_state._state = state.with_shoe(shoe)
+        sample_state.hidden_card = hidden_card
+        sample_state.agent = agent
+        sample_state._obs = None
+        return sample_state
 
     def get_observation(self):
-        '''Returns the observation from which the sample state is drawn.'''
-        return Observation(self._state, self.agent, self.hidden_card)
+        '''Returns the observation from which the sample state is drawn.
+
+        The observation is built lazily and cached: belief filtering
+        compares it against the live observation once per particle per
+        decision, but most sample states are never asked for it.
+        '''
+        if self._obs is None:
+            self._obs = Observation(self._state, self.agent, self.hidden_card)
+        return self._obs
 
     def sample(self, action):
-        '''Sample a possible future belief state.'''
-        next_state = self._state.sample(self.agent, action)
-        return SampleState(next_state, self.agent)
+        '''Sample a possible future belief state.
+
+        The hole-card hypothesis is drawn once, when the sample state is
+        created from an observation, and carried down every successor:
+        a particle is one guess about the hidden card plus a simulated
+        continuation, so redrawing the guess per step would leak one
+        extra card out of the shoe at every action and make the particle
+        inconsistent with every future observation.
+        '''
+        sample_state = SampleState.__new__(SampleState)
+        sample_state._state = self._state.sample(self.agent, action)
+        sample_state.hidden_card = self.hidden_card
+        sample_state.agent = self.agent
+        sample_state._obs = None
+        return sample_state
 
     def actions(self):
         '''Returns a set of valid actions.'''
@@ -338,6 +630,12 @@ class SampleState:
 class Agent:
     '''A base class for agents.'''
 
+    # Whether the policy inspects or samples the shoe. Observations only
+    # need the dealer's hole card folded back into the shoe for agents
+    # that do, so the simulator skips that correction (and its copy)
+    # when this is False.
+    observes_shoe = False
+
     @classmethod
     def from_fn(cls, policy):
         '''Constructs an Agent from a policy function.'''
@@ -366,12 +664,21 @@ class DealerAgent(Agent):
 
     def __init__(self, n=17):
         self.n = n
+        # The decision is a pure function of (score, soft) and only 46
+        # inputs exist, so the whole policy is tabulated up front;
+        # `policy` is then a pair of list indexes per call.
+        self._table = [[self._decide(score, soft == 1, score == 0)
+                        for soft in range(2)]
+                       for score in range(23)]
 
     def __str__(self):
         return f"Dealer {self.n}"
 
     def policy(self, obs, ctx):
         score, soft, busted = obs.score_soft_busted()
+        return self._table[score][soft]
+
+    def _decide(self, score, soft, busted):
         if score < self.n:
             return Action.HIT
         elif busted:
@@ -381,8 +688,30 @@ class DealerAgent(Agent):
         return Action.STAND
 
 
+class RoundStats:
+    '''The outcomes of a batch of rounds.
+
+    Holds every agent's score in every round as one matrix, with each
+    agent mapped to its column once so that per-agent queries are O(1)
+    NumPy slices.
+    '''
+
+    def __init__(self, scores, agents):
+        self.scores = scores
+        self.agents = tuple(agents)
+        self._index = {agent: j for j, agent in enumerate(self.agents)}
+
+    def __getitem__(self, agent):
+        '''Returns the column of scores for the given agent.'''
+        return self.scores[:, self._index[agent]]
+
+    def to_dataframe(self):
+        '''Returns the scores as a pandas DataFrame with one column per agent.'''
+        return pd.DataFrame(self.scores, columns=list(self.agents))
+
+
 class Simulator:
-    def __init__(self, *players, dealer=DealerAgent(), n_decks=4, cut=0.5):
+    def __init__(self, *players, dealer=DealerAgent(), n_decks=4, cut=0.5, seed=None):
         '''Constructs a new Simulator.
 
         Args:
@@ -390,18 +719,45 @@ class Simulator:
             dealer: The agent for the dealer.
             n_decks: The number of decks to play with.
             cut: Reshuffle the deck when it's size is below this percent.
+            seed: An optional seed for the shoe's random number generator.
         '''
         assert len(players) > 0, 'must have at least one player policy'
         assert 0 <= cut and cut < 1, 'cut must be between 0 and 1'
         self.dealer = dealer if isinstance(dealer, Agent) else Agent.from_fn(dealer)
         self.players = tuple(a if isinstance(a, Agent) else Agent.from_fn(a) for a in players)
-        self.start_shoe = Shoe(n_decks)
+        self.agents = self.players + (self.dealer,)
+        self.start_shoe = Shoe(n_decks, seed)
         self.n_decks = n_decks
         self.cut = cut
+        self._cut_threshold = 13 * n_decks * cut
+        self._np_rng = np.random.default_rng(seed)
+
+    def run(self, n_rounds, n_jobs=1):
+        '''Execute the simulation for some number of rounds and return a summary.
+
+        Args:
+            n_rounds: The number of rounds to play.
+            n_jobs: The number of worker processes. Rounds are split evenly
+                across workers, each playing from its own independently
+                seeded shoe. Rounds are independent up to the carry-over of
+                the shoe between reshuffles, so for large `n_rounds` the
+                split does not meaningfully change the statistics.
+        '''
+        if n_jobs > 1:
+            base_seed = random.randrange(2**32)
+            sizes = [n_rounds // n_jobs + (i < n_rounds % n_jobs) for i in range(n_jobs)]
+            jobs = [(self, size, base_seed + i) for i, size in enumerate(sizes) if size > 0]
+            with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                parts = list(executor.map(_run_rounds, jobs))
+            return RoundStats(np.concatenate(parts), self.agents)
+
+        agents = self.agents
+
+        # Rounds of purely rule-based agents can be simulated as one batch.
+        if all(type(agent) in (RandomAgent, DealerAgent) for agent in agents):
+            scores = self._run_vectorized(n_rounds)
+            return RoundStats(scores, agents)
 
-    def run(self, n_rounds):
-        '''Execute the simulation for some number of rounds and return a summary.'''
-        agents = self.players + (self.dealer,)
         scores = np.zeros((n_rounds, len(agents)), dtype=int)
         state = State.start_state(self.start_shoe, len(agents))
 
@@ -409,7 +765,7 @@ class Simulator:
             # Start state:
             # Reshuffle if below the cut, i.e. create a start state from the start shoe.
             # Otherwise create the start state reusing the previous shoe.
-            if len(state.shoe) < 13 * self.n_decks * self.cut:
+            if len(state.shoe) < self._cut_threshold:
                 state = State.start_state(self.start_shoe, len(agents))
             else:
                 state = State.start_state(state.shoe, len(agents))
@@ -418,9 +774,71 @@ class Simulator:
             for j, agent in enumerate(agents):
                 ctx = {}
                 while state.stand[j] == False:
-                    obs = state.get_observation(j, agent is self.dealer)
+                    # Agents that never look at the shoe get the cheap
+                    # observation without the hole-card correction.
+                    obs = state.get_observation(j, agent is self.dealer or not agent.observes_shoe)
                     action = agent.policy(obs, ctx)
                     state = state.sample(j, action)
-                scores[i,j] = state.score(j)
+            scores[i] = state.score_all()
+
+        return RoundStats(scores, agents)
 
-        return pd.DataFrame(scores, columns=[agent for agent in agents])
+    def _run_vectorized(self, n_rounds):
+        '''Simulates every round simultaneously with NumPy.
+
+        This is the fast path for rounds made up solely of rule-based
+        agents (`RandomAgent`, `DealerAgent`), whose decisions can be
+        computed for all rounds at once. Each round is dealt from a fresh
+        shoe; this is the one behavioral difference from the scalar loop,
+        where card counts carry over between reshuffles.
+        '''
+        agents = self.agents
+        n_agents = len(agents)
+        rng = self._np_rng
+
+        counts = np.full((n_rounds, 13), 4 * self.n_decks, dtype=int)
+        rank_counts = np.zeros((n_rounds, n_agents, 14), dtype=int)
+        stand = np.zeros((n_rounds, n_agents), dtype=bool)
+        all_rows = np.arange(n_rounds)
+
+        # The opening deal: two cards to each agent in turn.
+        for j in range(n_agents):
+            for _ in range(2):
+                cards = _draw_rows(counts, all_rows, rng)
+                rank_counts[all_rows, j, cards] += 1
+
+        # Let each agent play in every round until they stand or bust.
+        scores = np.zeros((n_rounds, n_agents), dtype=int)
+        for j, agent in enumerate(agents):
+            while True:
+                score, soft, busted = _score_hands_np(rank_counts[:, j, :])
+                if isinstance(agent, DealerAgent):
+                    hit = (score < agent.n) | (soft & (score == agent.n))
+                else:
+                    hit = rng.random(n_rounds) < 0.5
+                hit &= ~stand[:, j] & ~busted
+                stand[:, j] |= ~hit
+
+                rows = np.flatnonzero(hit)
+                if len(rows) == 0:
+                    scores[:, j] = score
+                    break
+
+                cards = _draw_rows(counts, rows, rng)
+                rank_counts[rows, j, cards] += 1
+
+        return scores
+
+
+def _run_rounds(job):
+    '''Plays a batch of rounds in a worker process for `Simulator.run`.
+
+    Returns the raw score matrix rather than a RoundStats: the simulator is
+    pickled into the worker, so its agents are copies, and the parent must
+    rebuild the agent mapping from its own agent objects.
+    '''
+    simulator, n_rounds, seed = job
+    random.seed(seed)
+    simulator.start_shoe.rng.seed(seed)
+    simulator._np_rng = np.random.default_rng(seed)
+    return simulator.run(n_rounds).scores
@@ -1,7 +1,6 @@
 import pomcp
 import blackjack
 
-<<<<<<< HEAD
 N = 10
 
 pomcp_agent = pomcp.POMCP()
@@ -19,12 +18,12 @@ pomcp_scores = outcomes[pomcp_agent]
 dealer_scores = outcomes[dealer]
 
 wins = pomcp_scores > dealer_scores
-losses = (pomcp_scores < dealer_scores) | pomcp_scores.apply(lambda score: score == 0)
-draws = (pomcp_scores == dealer_scores) & pomcp_scores.apply(lambda score: score > 0)
+losses = (pomcp_scores < dealer_scores) | (pomcp_scores == 0)
+draws = (pomcp_scores == dealer_scores) & (pomcp_scores > 0)
 
-n_wins = sum(wins)
-n_losses = sum(losses)
-n_draws = sum(draws)
+n_wins = wins.sum()
+n_losses = losses.sum()
+n_draws = draws.sum()
 
 
 
@@ -35,12 +34,4 @@ print(f'Draw %:  {n_draws / N:0.1%}')
 print()
 
 print('# Raw Outcomes:')
-print(outcomes)
-=======
-agent_pomcp = pomcp.POMCP()
-game_p = blackjack.Simulator(agent_pomcp, n_decks=3)
-print(game_p.run(10))
-#get wins
-#get draws
-#get losses
->>>>>>> origin/raj3
+print(outcomes.to_dataframe())
@@ -1,38 +1,29 @@
 
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
-from blackjack import Agent, Action, DealerAgent
+from blackjack import Agent, Action, DealerAgent, _dealer_rollout
 import random
 import math
 
 
-class Particle:
-    def __init__(self, obs, s):
-        self.obs = obs
-        self.s = s
-
-    @classmethod
-    def from_obs(cls, obs):
-        return cls(obs, obs.sample_state())
-
-    @classmethod
-    def from_s(cls, s):
-        return cls(s.get_observation(), s)
-
-
-
 class POMCP(Agent):
     '''POMCP algorithm
 
     SearchTree = class for maintaining search
     '''
 
+    observes_shoe = True
+
     def __init__(self,
                  discount=0.8,
                  depth=0,
                  epsilon=1e-7,
                  explore=7,
                  n_particles=128,
-                 reinvigoration=16):
+                 reinvigoration=16,
+                 n_workers=1,
+                 n_rollouts=1,
+                 batch_size=1):
 
         self.discount = discount
         self.depth = depth
@@ -41,13 +32,41 @@ class POMCP(Agent):
         self.n_particles = n_particles
         self.reinvigoration = reinvigoration
         self.rollout_policy = DealerAgent()
+        self.n_workers = n_workers
+        self.n_rollouts = n_rollouts
+        self.batch_size = batch_size
+
+        # Search stops where discount**depth drops below epsilon; the
+        # cutoff depth is fixed by the two parameters, so it is computed
+        # once here rather than via a float pow at every recursion step.
+        self._max_depth = math.ceil(math.log(epsilon) / math.log(discount))
+        self._executor = None
+
+        # Transposition table: canonical search node per reachable state,
+        # so sample paths that land on the same (hands, shoe, stand)
+        # state share one node and its statistics. Bounded below.
+        self.transpositions = {}
+        self.max_transpositions = 1 << 16
 
 
     def __str__(self):
         return "POMCP"
 
 
+    def __getstate__(self):
+        # The worker pool cannot be pickled along with the agent, and
+        # shipping the transposition table to workers would defeat the
+        # point of pickling being cheap.
+        state = self.__dict__.copy()
+        state['_executor'] = None
+        state['transpositions'] = {}
+        return state
+
+
     def policy(self, obs, ctx):
+        if self.n_workers > 1:
+            return self._root_parallel_policy(obs, ctx)
+
         tree = ctx.get('pomcp_root')
 
         at_root = tree is None
@@ -55,72 +74,265 @@ class POMCP(Agent):
         if at_root:
             tree = SearchTree()
             ctx['pomcp_root'] = tree
-            tree.particles = [Particle.from_obs(obs) for _ in range(self.n_particles)]
+            tree.particles = obs.sample_states(self.n_particles)
         else:
-            particles = [part for part in tree.particles if part.obs == obs]
-            for _ in range(self.reinvigoration):
-                particles.append(Particle.from_obs(obs))
+            particles = [part for part in tree.particles
+                         if part.get_observation() == obs]
+            particles.extend(obs.sample_states(self.reinvigoration))
             tree.particles = particles
 
-        for i in range(self.n_particles):
-            part = random.sample(tree.particles, 1)[0]
-            self.simulate(part, tree, 0)
+        # One bulk draw covers the whole simulation loop; the index is
+        # rescaled per iteration because the particle list keeps growing.
+        us = np.random.random(self.n_particles)
+        if self.batch_size > 1:
+            for lo in range(0, self.n_particles, self.batch_size):
+                states = [tree.particles[int(u * len(tree.particles))]
+                          for u in us[lo:lo + self.batch_size]]
+                self.simulate_batch(states, tree)
+        else:
+            for u in us:
+                part = tree.particles[int(u * len(tree.particles))]
+                self.simulate(part, tree, 0)
+
+        actions = obs.actions()
+        idx = max((a - 1 for a in actions), key=lambda i: tree.child_values[i])
+        child = tree.children[idx]
+        ctx['pomcp_root'] = child
+        return child.action
+
+    def _root_parallel_policy(self, obs, ctx):
+        '''Root parallelization: independent searches merged at the root.
+
+        Each worker grows its own tree from the same observation; the
+        root children's statistics are then amalgamated with a
+        visit-weighted average before picking the action.
+        '''
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.n_workers)
+
+        base_seed = random.randrange(2**32)
+        jobs = [(self, obs, base_seed + i) for i in range(self.n_workers)]
+        stats = list(self._executor.map(_root_search, jobs))
+
+        tree = SearchTree()
+        tree.expand()
+        for i in range(len(tree.children)):
+            visit = sum(s[i][0] for s in stats)
+            tree.child_visits[i] = visit
+            tree.child_values[i] = sum(s[i][0] * s[i][1] for s in stats) / visit
 
         actions = obs.actions()
-        children = filter(lambda child: child.action in actions, tree.children)
-        child = max(children, key=lambda child: child.value)
+        idx = max((a - 1 for a in actions), key=lambda i: tree.child_values[i])
+        child = tree.children[idx]
         ctx['pomcp_root'] = child
         return child.action
 
-    def simulate(self, part, tree, depth):
-        if self.discount**depth < self.epsilon:
-            return 0
-        if len(tree.children) == 0:
-
-            tree.expand()
-            return self.rollout(part, depth)
-        actions = part.s.actions()
-        if len(actions) is 0:
-            return 0
-
-        children = filter(lambda child: child.action in actions, tree.children)
-        child = max(children, key=lambda child: child.value + self.explore * tree.ucb(child))
-        action = child.action
-
-        new_s = part.s.sample(action)
-        new_part = Particle.from_s(new_s)
-        reward = new_s.score() + self.discount * self.simulate(new_part, child, depth + 1)
-        tree.particles.append(new_part)
-
-        tree.visit += 1
-        child.visit += 1
-        child.value += (reward - child.value) / child.visit
+    def simulate(self, s, tree, depth):
+        # Particles are plain SampleStates; the old Particle wrapper only
+        # paired a state with an eagerly-built observation, which
+        # SampleState now constructs lazily on demand.
+        path, leaf_s, leaf_depth = self._descend(s, tree, depth, False)
+        reward = self._leaf_reward(leaf_s, leaf_depth)
+        return self._backprop(path, reward)
+
+    def simulate_batch(self, states, tree):
+        '''Runs one search iteration per state as a batch of descents.
+
+        Each descent leaves a virtual visit on the children it passes,
+        biasing the following descents in the batch toward unexplored
+        siblings; the virtual visits are removed before the real
+        rollouts and backups are applied.
+        '''
+        descents = [self._descend(s, tree, 0, True) for s in states]
+
+        for path, _, _ in descents:
+            for node, idx, _ in path:
+                node.child_visits[idx] -= 1
+
+        for path, leaf_s, leaf_depth in descents:
+            reward = self._leaf_reward(leaf_s, leaf_depth)
+            self._backprop(path, reward)
+
+    def _descend(self, s, tree, depth, virtual):
+        '''Walks the tree by UCB1 selection until a leaf is expanded.
+
+        Iterative rather than recursive: the horizon is ~70 levels and
+        a Python frame per level is most of the per-step cost. Returns
+        the traversed `(node, child_index, state)` path plus the leaf
+        state and depth to roll out from, or `None` for a terminal cut.
+        With `virtual`, each traversed child keeps a virtual visit for
+        batched search; the caller removes them.
+        '''
+        explore = self.explore
+        path = []
+        while True:
+            if depth >= self._max_depth:
+                return path, None, depth
+            if len(tree.children) == 0:
+                tree.expand()
+                return path, s, depth
+            actions = s.actions()
+            if len(actions) == 0:
+                return path, None, depth
+
+            # UCB1 selection, written as a plain loop: a max() over a
+            # generator with a key lambda costs a frame per child, which
+            # is material at one selection per node visit.
+            log_visit = math.log(tree.visit)
+            visits = tree.child_visits
+            values = tree.child_values
+            idx = 0
+            best = -math.inf
+            for a in actions:
+                i = a - 1
+                ucb = values[i] + explore * math.sqrt(log_visit / visits[i])
+                if ucb > best:
+                    idx = i
+                    best = ucb
+            child = tree.children[idx]
+            if virtual:
+                visits[idx] += 1
+
+            new_s = s.sample(child.action)
+            node = self._node_for(new_s, child)
+            path.append((tree, idx, new_s))
+
+            # The arriving state becomes a belief particle of the node
+            # it arrives at, so when the root moves to a child after a
+            # real action, that child already holds states one action
+            # ahead of the old root — the level the next observation is
+            # filtered against. Capped at the root belief size; without
+            # a bound the lists grow by one particle per visit forever.
+            if len(node.particles) < self.n_particles:
+                node.particles.append(new_s)
+
+            s = new_s
+            tree = node
+            depth += 1
+
+    def _leaf_reward(self, leaf_s, leaf_depth):
+        '''The rollout estimate for a freshly expanded leaf.'''
+        if leaf_s is None:
+            return 0.0
+        # Averaging several rollouts per expansion lowers the variance
+        # of the leaf estimate for the cost of the rollouts alone,
+        # since the descent above is shared.
+        n = self.n_rollouts
+        if n == 1:
+            return self.rollout(leaf_s, leaf_depth)
+        return sum(self.rollout(leaf_s, leaf_depth) for _ in range(n)) / n
+
+    def _backprop(self, path, reward):
+        '''Applies a discounted return along a descent path, deepest first.'''
+        for tree, idx, new_s in reversed(path):
+            reward = new_s.score() + self.discount * reward
+
+            tree.visit += 1
+            visits = tree.child_visits
+            n = visits[idx] + 1
+            visits[idx] = n
+            values = tree.child_values
+            values[idx] += (reward - values[idx]) / n
+
         return reward
 
-    def rollout(self, part, depth):
-        if self.discount**depth < self.epsilon:
-            return 0
-        if len(part.s.actions()) == 0:
-            return 0
-        action = self.rollout_policy.policy(part.obs, {})
-        new_s = part.s.sample(action)
-        new_part = Particle.from_s(new_s)
-        return new_s.score() + self.discount * self.rollout(new_part, depth + 1)
+    def _node_for(self, s, child):
+        '''Returns the canonical search node for a sampled state.
+
+        Blackjack states are fully characterized by the hands, the shoe
+        counts, and who stands, so isomorphic states reached along
+        different sample paths share one node — the search graph is a
+        DAG rather than a tree, and the shared node merges the visit
+        statistics of every path that reaches it. States always consume
+        cards, so the sharing cannot create a cycle.
+        '''
+        state = s._state
+        key = (state.hands, tuple(state.shoe.counts), s.agent, state.stand)
+        node = self.transpositions.get(key)
+        if node is None:
+            # A cheap bound on table growth: entries are per-shoe, so a
+            # stale half never gets hit again and a flush is harmless.
+            if len(self.transpositions) >= self.max_transpositions:
+                self.transpositions.clear()
+            self.transpositions[key] = node = child
+        return node
+
+    def rollout(self, s, depth):
+        # With the default dealer rollout policy the whole playout runs
+        # inside the compiled `_dealer_rollout` kernel: no State or
+        # SampleState objects are built per step, just one scratch copy
+        # of the shoe counts per rollout.
+        state = s._state
+        agent = s.agent
+        if state.stand[agent]:
+            return 0.0
+
+        policy = self.rollout_policy
+        if type(policy) is DealerAgent:
+            counts = np.array(state.shoe.counts)
+            return _dealer_rollout(state.hands[agent], counts,
+                                   len(state.shoe), policy.n,
+                                   self.discount,
+                                   self._max_depth - depth)
+
+        # Generic fallback for custom rollout policies. The policy only
+        # ever queries the hand, so the sampled state doubles as its
+        # observation; the discount is carried incrementally in `gamma`.
+        total = 0.0
+        gamma = 1.0
+        for _ in range(depth, self._max_depth):
+            if len(s.actions()) == 0:
+                break
+            action = policy.policy(s, {})
+            s = s.sample(action)
+            total += gamma * s.score()
+            gamma *= self.discount
+        return total
+
+
+def _root_search(job):
+    '''Grows one independent search tree in a worker process.
+
+    Returns the `(visit, value)` statistics of the root children, in
+    action order, for the parent to merge.
+    '''
+    agent, obs, seed = job
+    random.seed(seed)
+    np.random.seed(seed)
+    obs._state.shoe.rng.seed(seed)
+
+    tree = SearchTree()
+    tree.particles = obs.sample_states(agent.n_particles)
+    for u in np.random.random(agent.n_particles):
+        part = tree.particles[int(u * len(tree.particles))]
+        agent.simulate(part, tree, 0)
+
+    return list(zip(tree.child_visits, tree.child_values))
 
 
 class SearchTree:
-    def __init__(self, particles=[], action=None, visit=1, value=0):
-        self.particles = particles
+
+    # One node per reachable search state; slots keep nodes compact and
+    # make attribute access a fixed-offset load in the selection loop.
+    __slots__ = ('particles', 'visit', 'action', 'children',
+                 'child_visits', 'child_values')
+
+    def __init__(self, particles=None, action=None, visit=1):
+        # A `None` sentinel rather than `particles=[]`: a mutable default
+        # would be shared by every node, and the particle lists are
+        # mutated in place during search.
+        self.particles = [] if particles is None else particles
         self.visit = visit
-        self.value = value
         self.action = action
-        self.children = set()
+        self.children = []
+        self.child_visits = []
+        self.child_values = []
 
     def expand(self):
-        for a in Action:
-            self.children.add(SearchTree(action=a))
-
-    def ucb(self, child):
-        log = math.log(self.visit, len(self.children))
-        div = log / child.visit
-        return math.sqrt(div)
+        # Children are indexed by action so lookups need no search: the
+        # child for `a` is `children[a - 1]`. Their statistics live in
+        # parallel lists on the parent, so selection and backprop index
+        # two flat lists instead of chasing per-child objects.
+        self.children = [SearchTree(action=a) for a in Action]
+        self.child_visits = [1] * len(self.children)
+        self.child_values = [0.0] * len(self.children)